@@ -1,104 +1,264 @@
 # server.py
-from flask import Flask, request, jsonify, send_from_directory, abort
+from quart import Quart, request, jsonify, send_from_directory, abort
 import os
-import requests
-from xml.etree import ElementTree as ET
+import sys
+import asyncio
+import multiprocessing
+import orjson
+import sqlite3
+import threading
 import time
+import httpx
+from aiolimiter import AsyncLimiter
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from lxml import etree
 from urllib.parse import quote_plus
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
 
-app = Flask(__name__, static_folder='static', static_url_path='')
+app = Quart(__name__, static_folder='static', static_url_path='')
 
 ENTREZ_BASE = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
 API_KEY = os.environ.get("NCBI_API_KEY")
 USER_EMAIL = os.environ.get("USER_EMAIL", "you@example.com")
-SESSION = requests.Session()
-SESSION.headers.update({"User-Agent": f"NCBIEntrezGraph/2.0 ({USER_EMAIL})"})
+HEADERS = {"User-Agent": f"NCBIEntrezGraph/2.0 ({USER_EMAIL})"}
 
-# small delay between requests to be polite to NCBI
-DELAY = 0.35  # ~3 requests/sec
+# NCBI allows 10 requests/sec with an API key, 3/sec without. The limit is
+# per process, so divide it between workers when running several (NCBI_RATE).
+MAX_CONCURRENCY = 10
+NCBI_RATE = float(os.environ.get("NCBI_RATE", 10 if API_KEY else 3))
+RATE_LIMITER = AsyncLimiter(NCBI_RATE, 1)
+# processes per server worker for efetch parsing (default: one per core)
+PARSE_WORKERS = int(os.environ.get("PARSE_WORKERS", 0)) or None
+SEMAPHORE = asyncio.Semaphore(MAX_CONCURRENCY)
+CLIENT = None  # httpx.AsyncClient, opened at startup
+PROC_POOL = None  # ProcessPoolExecutor for efetch parsing, started at startup
 
-def _get(endpoint, params):
-    params = params.copy() if params else {}
+# esummary/efetch/elink accept many ids per request
+BATCH_SIZE = 200
+
+# parsed Entrez results are cached per PMID; PubMed records rarely change within a day
+CACHE_PATH = os.environ.get("NCBI_CACHE_PATH", os.path.join(app.root_path, "ncbi_cache.sqlite"))
+CACHE_TTL = 86400
+CACHE_MEMORY_SIZE = 4096
+
+@app.before_serving
+async def _startup():
+    global CLIENT, PROC_POOL
+    # HTTP/2 multiplexes concurrent Entrez calls over one TLS connection
+    CLIENT = httpx.AsyncClient(
+        http2=True,
+        headers=HEADERS,
+        limits=httpx.Limits(max_connections=MAX_CONCURRENCY, max_keepalive_connections=MAX_CONCURRENCY),
+        timeout=30,
+    )
+    # efetch parsing is CPU-bound; run it outside the event loop and the GIL.
+    # Workers come from a forkserver, since forking this threaded process is unsafe.
+    PROC_POOL = ProcessPoolExecutor(
+        max_workers=PARSE_WORKERS, mp_context=multiprocessing.get_context("forkserver"))
+
+@app.after_serving
+async def _shutdown():
+    await CLIENT.aclose()
+    PROC_POOL.shutdown()
+
+def _query(params):
+    # params may be a dict or a list of pairs (elink takes repeated id=)
+    params = list(params.items() if isinstance(params, dict) else params or [])
     if API_KEY:
-        params["api_key"] = API_KEY
-    r = SESSION.get(f"{ENTREZ_BASE}/{endpoint}.fcgi", params=params, timeout=30)
-    r.raise_for_status()
-    time.sleep(DELAY)
-    return r
+        params.append(("api_key", API_KEY))
+    return params
+
+async def _get(endpoint, params):
+    async with SEMAPHORE, RATE_LIMITER:
+        r = await CLIENT.get(f"{ENTREZ_BASE}/{endpoint}.fcgi", params=_query(params))
+        r.raise_for_status()
+        return r.content
+
+def _chunks(items, size):
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+class EntrezCache:
+    """
+    Per-PMID cache of parsed Entrez results: an in-process LRU in front of
+    a sqlite file. Entries are keyed by kind ("summary", "refs", ...) and
+    PMID, so they can be reused whatever batch they were fetched in.
+    The sqlite layer is best-effort: it runs off the event loop, and if it
+    can't be opened or errors, the cache falls back to memory and the network.
+    """
+
+    def __init__(self, path, ttl=CACHE_TTL, maxsize=CACHE_MEMORY_SIZE):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._mem = OrderedDict()
+        # one connection shared by worker threads; the lock keeps transactions apart
+        self._lock = threading.Lock()
+        try:
+            self._db = sqlite3.connect(path, timeout=1, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS entrez (key TEXT PRIMARY KEY, value TEXT, stored REAL)")
+        except sqlite3.Error:
+            self._db = None
+
+    def _remember(self, key, stored, value):
+        self._mem[key] = (stored, value)
+        self._mem.move_to_end(key)
+        if len(self._mem) > self.maxsize:
+            self._mem.popitem(last=False)
+
+    def _read(self, keys, cutoff):
+        # runs in a worker thread; returns [(key, stored, value)] for fresh rows
+        found = []
+        try:
+            with self._lock:
+                for chunk in _chunks(keys, BATCH_SIZE):
+                    rows = self._db.execute(
+                        f"SELECT key, value, stored FROM entrez WHERE stored > ? AND key IN ({','.join('?' * len(chunk))})",
+                        [cutoff, *chunk]).fetchall()
+                    found.extend((key, stored, value) for key, value, stored in rows)
+        except sqlite3.Error:
+            return []
+        out = []
+        for key, stored, value in found:
+            try:
+                out.append((key, stored, orjson.loads(value)))
+            except orjson.JSONDecodeError:
+                continue
+        return out
+
+    def _write(self, rows):
+        # runs in a worker thread
+        try:
+            with self._lock, self._db:
+                self._db.executemany("INSERT OR REPLACE INTO entrez VALUES (?, ?, ?)", rows)
+        except sqlite3.Error:
+            pass
+
+    async def get_many(self, kind, pmids):
+        # returns {pmid: value} for the PMIDs that are cached and fresh
+        cutoff = time.time() - self.ttl
+        hits = {}
+        missing = {}
+        for p in pmids:
+            key = f"{kind}:{p}"
+            entry = self._mem.get(key)
+            if entry is not None and entry[0] > cutoff:
+                self._mem.move_to_end(key)
+                hits[p] = entry[1]
+            else:
+                missing[key] = p
+        if missing and self._db is not None:
+            for key, stored, value in await asyncio.to_thread(self._read, list(missing), cutoff):
+                self._remember(key, stored, value)
+                hits[missing[key]] = value
+        return hits
+
+    async def set_many(self, kind, items):
+        now = time.time()
+        rows = []
+        for p, value in items.items():
+            key = f"{kind}:{p}"
+            self._remember(key, now, value)
+            rows.append((key, orjson.dumps(value), now))
+        if rows and self._db is not None:
+            await asyncio.to_thread(self._write, rows)
 
-def search_term_to_pmids(term, retmax=20):
+CACHE = EntrezCache(CACHE_PATH)
+
+async def search_term_to_pmids(term, retmax=20):
     if not term:
         return []
     try:
-        r = _get("esearch", {"db":"pubmed","term":term,"retmode":"json","retmax":retmax})
-        j = r.json()
+        body = await _get("esearch", {"db":"pubmed","term":term,"retmode":"json","retmax":retmax})
+        j = orjson.loads(body)
         ids = j.get("esearchresult", {}).get("idlist", [])
-        return [str(x) for x in ids]
+        return [sys.intern(str(x)) for x in ids]
     except Exception:
         return []
 
-def get_article_summary_by_pmid(pmid):
-    # safe fetch of summary + efetch for abstract + MeSH
-    title = ""
-    journal = ""
-    pubdate = ""
-    abstract = ""
-    mesh_data = []
+async def resolve_seed(seed, retmax=20):
+    # a bare ASCII number is taken as a PMID, anything else as a search term
+    # (str.isdigit alone accepts characters like "²" that aren't PMIDs)
+    if seed.isascii() and seed.isdigit():
+        return [sys.intern(seed)]
+    return await search_term_to_pmids(seed, retmax=retmax)
 
-    try:
-        r = _get("esummary", {"db":"pubmed","id":pmid,"retmode":"json"})
-        j = r.json()
-        res = j.get("result", {}).get(str(pmid), {})
-        title = (res.get("title") or "").strip()
-        journal = (res.get("fulljournalname") or "").strip()
-        pubdate = (res.get("pubdate") or "").strip()
-    except Exception:
-        pass
+# compiled once and anchored at the record element, so no recursive .// scans
+_XP_PMID = etree.XPath("string(MedlineCitation/PMID)")
+_XP_TITLE = etree.XPath("string(MedlineCitation/Article/ArticleTitle)")
+_XP_ABSTRACT = etree.XPath("MedlineCitation/Article/Abstract")
+_XP_ABSTRACT_TEXT = etree.XPath("MedlineCitation/Article/Abstract/AbstractText")
+_XP_MESH = etree.XPath("MedlineCitation/MeshHeadingList/MeshHeading")
+# <PubmedBookArticle> (StatPearls, GeneReviews, ...) keeps its fields under BookDocument
+_XP_BOOK_PMID = etree.XPath("string(BookDocument/PMID)")
+_XP_BOOK_TITLE = etree.XPath("string(BookDocument/ArticleTitle)")
+_XP_BOOK_BOOKTITLE = etree.XPath("string(BookDocument/Book/BookTitle)")
+_XP_BOOK_ABSTRACT = etree.XPath("BookDocument/Abstract")
+_XP_BOOK_ABSTRACT_TEXT = etree.XPath("BookDocument/Abstract/AbstractText")
 
-    try:
-        r2 = _get("efetch", {"db":"pubmed","id":pmid,"retmode":"xml"})
-        root = ET.fromstring(r2.text)
-        if not title:
-            art_title_el = root.find(".//ArticleTitle") or root.find(".//Title")
-            if art_title_el is not None:
-                t = "".join(art_title_el.itertext()).strip()
-                if t:
-                    title = t
-        abs_parts = [a.text.strip() for a in root.findall(".//AbstractText") if a.text]
-        if abs_parts:
-            abstract = "\n\n".join(abs_parts)
-        else:
-            abs_el = root.find(".//Abstract")
-            if abs_el is not None:
-                abstract = "".join(abs_el.itertext()).strip()
-        # Mesh
-        for mh in root.findall(".//MeshHeading"):
-            descriptor = mh.find("DescriptorName")
-            if descriptor is None: continue
-            desc_name = descriptor.text.strip()
-            desc_id = descriptor.attrib.get("UI")
-            desc_major = descriptor.attrib.get("MajorTopicYN") == "Y"
-            qualifiers = []
-            for q in mh.findall("QualifierName"):
-                qualifiers.append({
-                    "name": q.text.strip(),
-                    "id": q.attrib.get("UI"),
-                    "major": q.attrib.get("MajorTopicYN") == "Y"
-                })
-            mesh_data.append({
-                "descriptor": desc_name,
-                "descriptor_id": desc_id,
-                "major": desc_major,
-                "qualifiers": qualifiers
+def _parse_pubmed_article(article):
+    # PMID, title, abstract and MeSH from one <PubmedArticle> or <PubmedBookArticle>
+    if article.tag == "PubmedBookArticle":
+        pmid = _XP_BOOK_PMID(article).strip() or None
+        # a chapter has its own title; a whole book only has the book title
+        title = _XP_BOOK_TITLE(article).strip() or _XP_BOOK_BOOKTITLE(article).strip()
+        abs_texts = _XP_BOOK_ABSTRACT_TEXT(article)
+        abs_els = _XP_BOOK_ABSTRACT(article)
+        meshes = []
+    else:
+        pmid = _XP_PMID(article).strip() or None
+        title = _XP_TITLE(article).strip()
+        abs_texts = _XP_ABSTRACT_TEXT(article)
+        abs_els = _XP_ABSTRACT(article)
+        meshes = _XP_MESH(article)
+
+    abs_parts = [a.text.strip() for a in abs_texts if a.text]
+    if abs_parts:
+        abstract = "\n\n".join(abs_parts)
+    else:
+        abstract = "".join(abs_els[0].itertext()).strip() if abs_els else ""
+
+    mesh_data = []
+    for mh in meshes:
+        descriptor = mh.find("DescriptorName")
+        if descriptor is None: continue
+        qualifiers = []
+        for q in mh.findall("QualifierName"):
+            qualifiers.append({
+                "name": (q.text or "").strip(),
+                "id": q.get("UI"),
+                "major": q.get("MajorTopicYN") == "Y"
             })
-    except Exception:
-        pass
+        mesh_data.append({
+            "descriptor": (descriptor.text or "").strip(),
+            "descriptor_id": descriptor.get("UI"),
+            "major": descriptor.get("MajorTopicYN") == "Y",
+            "qualifiers": qualifiers
+        })
+
+    return pmid, {"title": title, "abstract": abstract, "mesh": mesh_data}
+
+def _display_title(title, max_len=200):
+    # short form for the node label; the record keeps the full title
+    if len(title) > max_len:
+        return title[:max_len].rstrip() + "..."
+    return title
+
+def _parse_article(pmid, summary, fetched):
+    # build one article record from its esummary entry and parsed efetch fields
+    fetched = fetched or {}
+    title = (summary.get("title") or "").strip() or fetched.get("title", "")
+    journal = (summary.get("fulljournalname") or "").strip()
+    pubdate = (summary.get("pubdate") or "").strip()
+    abstract = fetched.get("abstract", "")
+    mesh_data = fetched.get("mesh", [])
 
     if not title:
         title = f"(Untitled article, PMID {pmid})"
-    else:
-        if len(title) > 800:
-            title = title[:200].rstrip() + "..."
     if not abstract:
         abstract = "(No abstract available.)"
 
@@ -111,30 +271,188 @@ def get_article_summary_by_pmid(pmid):
         "mesh": mesh_data
     }
 
-def get_citations_of(pmid, direction="refs", limit=200):
-    if not pmid:
-        return []
-    linkname = "pubmed_pubmed_refs" if direction == "refs" else "pubmed_pubmed_citedin"
+def parse_efetch_batch(xml_bytes):
+    """
+    Parse an efetch PubmedArticleSet (journal and book records) into
+    {pmid: {"title", "abstract", "mesh"}}.
+    Takes and returns plain picklable data so it can run in PROC_POOL.
+    """
+    articles = {}
+    for _, article in etree.iterparse(BytesIO(xml_bytes), events=("end",),
+                                      tag=("PubmedArticle", "PubmedBookArticle")):
+        # a malformed article is skipped rather than losing the whole batch
+        try:
+            pmid, fields = _parse_pubmed_article(article)
+        except Exception:
+            pmid = None
+        if pmid:
+            articles[pmid] = fields
+        # drop finished articles so the tree stays small for large batches
+        article.clear()
+        while article.getprevious() is not None:
+            del article.getparent()[0]
+    return articles
+
+async def _fetch_summary_batch(pmids):
+    # one esummary + one efetch for the whole batch, issued together
+    ids = ",".join(pmids)
+    summaries = {}
+    articles = {}
+    complete = True
+
+    async def fetch_articles():
+        body = await _get("efetch", {"db":"pubmed","id":ids,"retmode":"xml"})
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(PROC_POOL, parse_efetch_batch, body)
+
+    summary_body, fetched = await asyncio.gather(
+        _get("esummary", {"db":"pubmed","id":ids,"retmode":"json"}),
+        fetch_articles(),
+        return_exceptions=True)
+
     try:
-        r = _get("elink", {"dbfrom":"pubmed","db":"pubmed","id":pmid,"linkname":linkname,"retmode":"json"})
-        j = r.json()
-        out = []
-        for ls in j.get("linksets", []):
-            for ln in ls.get("linksetdb", []):
-                out.extend([str(i) for i in ln.get("links", [])])
-        # unique preserve order
-        seen = []
-        for i in out:
-            if i not in seen:
-                seen.append(i)
-            if len(seen) >= limit:
-                break
-        return seen
+        if isinstance(summary_body, Exception):
+            raise summary_body
+        j = orjson.loads(summary_body)
+        summaries = j.get("result", {})
+        # NCBI reports some failures as a 200 with an error payload
+        if "error" in j or "result" not in j:
+            complete = False
     except Exception:
-        return []
+        complete = False
+
+    if isinstance(fetched, Exception):
+        complete = False
+    else:
+        articles = fetched
+
+    out = {p: _parse_article(p, summaries.get(p) or {}, articles.get(p)) for p in pmids}
+    # placeholders from a failed call must not outlive this request
+    if complete:
+        await CACHE.set_many("summary", out)
+    return out
+
+async def get_article_summaries(pmids, chunk=BATCH_SIZE):
+    """
+    Fetch title, abstract, journal, date and MeSH for many PMIDs.
+    Returns a dict keyed by PMID; batches of `chunk` ids go out concurrently.
+    """
+    pmids = [sys.intern(str(p)) for p in pmids]
+    out = await CACHE.get_many("summary", pmids)
+    to_fetch = [p for p in pmids if p not in out]
+    batches = await asyncio.gather(*[_fetch_summary_batch(c) for c in _chunks(to_fetch, chunk)])
+    for b in batches:
+        out.update(b)
+    return out
+
+async def _fetch_citation_batch(pmids, linkname):
+    # repeated id= params make elink return one linkset per input PMID
+    params = [("dbfrom","pubmed"), ("db","pubmed"), ("linkname",linkname), ("retmode","json")]
+    params.extend(("id", p) for p in pmids)
+    out = {p: [] for p in pmids}
+    try:
+        body = await _get("elink", params)
+        j = orjson.loads(body)
+    except Exception:
+        return out
+    # an error payload arrives as a 200; return empty links without caching them
+    if "ERROR" in j or "error" in j or "linksets" not in j:
+        return out
+    for ls in j.get("linksets", []):
+        ids = [str(i) for i in ls.get("ids", [])]
+        if len(ids) != 1 or ids[0] not in out:
+            continue
+        links = []
+        # the JSON output names this list "linksetdbs"
+        for ln in ls.get("linksetdbs", ls.get("linksetdb", [])):
+            links.extend([str(i) for i in ln.get("links", [])])
+        # unique preserve order
+        out[ids[0]] = list(dict.fromkeys(links))
+    await CACHE.set_many(linkname, out)
+    return out
+
+async def get_citations_of(pmids, direction="refs", limit=200, chunk=BATCH_SIZE):
+    """
+    Look up references (or citing articles) for many PMIDs.
+    Returns a dict of PMID -> list of linked PMIDs, at most `limit` each.
+    """
+    pmids = [sys.intern(str(p)) for p in pmids if p]
+    if not pmids:
+        return {}
+    linkname = "pubmed_pubmed_refs" if direction == "refs" else "pubmed_pubmed_citedin"
+    # full link lists are cached; `limit` is applied per call
+    out = await CACHE.get_many(linkname, pmids)
+    to_fetch = [p for p in pmids if p not in out]
+    batches = await asyncio.gather(*[
+        _fetch_citation_batch(c, linkname) for c in _chunks(to_fetch, chunk)])
+    for b in batches:
+        out.update(b)
+    # interned so each PMID is one shared str across nodes, links and seed groups
+    return {p: [sys.intern(r) for r in out[p][:limit]] for p in pmids}
+
+# node color per seed, cycling every 8 seeds
+_PALETTE = ("#00bcd4","#ff9800","#8bc34a","#e91e63","#9c27b0","#ff5722","#03a9f4","#cddc39")
+
+@dataclass(slots=True)
+class GraphNode:
+    # one article in the graph response; orjson serialises it directly
+    id: str
+    name: str
+    title_full: str
+    abstract: str
+    journal: str
+    pubdate: str
+    mesh: list
+    mesh_detail: list
+    val: int = 12
+    color: str = ""
+    seedGroup: str = ""
+    seedGroups: list = field(default_factory=list)
+    shared: bool = False
+
+def _cluster_links(pmids, edges):
+    """
+    Links chaining the connected components of `edges` over `pmids`, one
+    per gap, so a seed's cluster holds together in the layout. Each
+    component is represented by its lowest PMID, which keeps the result
+    deterministic. Returns nothing if the citations already connect everything.
+    """
+    parent = {p: p for p in pmids}
+
+    def find(p):
+        while parent[p] != p:
+            parent[p] = parent[parent[p]]
+            p = parent[p]
+        return p
+
+    for a, b in edges:
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            parent[rb] = ra
+
+    heads = {}
+    for p in sorted(pmids, key=int):
+        heads.setdefault(find(p), p)
+    heads = list(heads.values())
+    return zip(heads, heads[1:])
+
+def _json_array(items, chunk=256):
+    # serialise a list as JSON array pieces of `chunk` items each
+    yield b"["
+    for i, part in enumerate(_chunks(items, chunk)):
+        yield (b"," if i else b"") + b",".join(map(orjson.dumps, part))
+    yield b"]"
+
+def _stream_graph(nodes, links):
+    # sent piecewise so the client receives the first nodes before the whole graph is serialised
+    yield b'{"nodes":'
+    yield from _json_array(nodes)
+    yield b',"links":'
+    yield from _json_array(links)
+    yield b"}"
 
 @app.route('/api/graph')
-def api_graph():
+async def api_graph():
     """
     Query parameters:
       seeds (comma-separated terms or PMIDs)
@@ -142,7 +460,8 @@ def api_graph():
       connector_limit (how many refs to fetch per PMID)
     """
     seeds_raw = request.args.get('seeds', '')
-    seeds = [s.strip() for s in seeds_raw.split(',') if s.strip()]
+    # repeated seeds add nothing, keep the first occurrence
+    seeds = list(dict.fromkeys(s.strip() for s in seeds_raw.split(',') if s.strip()))
     if not seeds:
         return jsonify({"error":"no seeds provided"}), 400
     try:
@@ -154,93 +473,83 @@ def api_graph():
     except:
         connector_limit = 20
 
-    all_nodes = {}
-    all_links = set()
+    all_links = set()  # (source, target) pmid pairs
+
+    # phase 1: resolve every seed to pmids concurrently
+    resolved = await asyncio.gather(*[resolve_seed(s, retmax=limit) for s in seeds])
+    seed_pmids = dict(zip(seeds, resolved))
+
+    # phase 2: refs for each distinct seed PMID, looked up once however many seeds share it
+    all_seed_pmids = set().union(*seed_pmids.values())
+    refs_by_pmid = await get_citations_of(all_seed_pmids, direction="refs", limit=connector_limit)
 
-    def edge_key(a,b):
-        return f"{a}->{b}"
+    # phase 3: metadata for each distinct PMID, fetched once
+    all_pmids = all_seed_pmids | {r for rs in refs_by_pmid.values() for r in rs}
+    metas = await get_article_summaries(all_pmids)
 
+    # record which seeds reach each PMID, by seed index
+    node_seeds = defaultdict(set)
     for s_index, seed in enumerate(seeds):
-        # resolve seed to pmids
-        if seed.isdigit():
-            pmids = [seed]
-        else:
-            pmids = search_term_to_pmids(seed, retmax=limit)
+        pmids = seed_pmids[seed]
         if not pmids:
             continue
 
         local_pmids = set(pmids)
-        # gather connectors (refs)
         for p in pmids:
-            refs = get_citations_of(p, direction="refs", limit=connector_limit)
-            for r in refs:
-                local_pmids.add(r)
-
-        # fetch metadata for local PMIDs
-        for pmid in list(local_pmids):
-            if pmid in all_nodes:
-                # mark shared
-                all_nodes[pmid]['shared'] = True
-                if seed not in all_nodes[pmid]['seedGroups']:
-                    all_nodes[pmid]['seedGroups'].append(seed)
-                all_nodes[pmid]['color'] = "#ffffff"
-            else:
-                meta = get_article_summary_by_pmid(pmid)
-                mesh_list = [m['descriptor'] for m in meta.get('mesh', [])] if meta.get('mesh') else []
-                node = {
-                    "id": pmid,
-                    "name": meta['title'],
-                    "title_full": meta['title'],
-                    "abstract": meta['abstract'],
-                    "journal": meta['journal'],
-                    "pubdate": meta['pubdate'],
-                    "mesh": mesh_list,
-                    "mesh_detail": meta.get('mesh', []),
-                    "val": 12,
-                    "color": ["#00bcd4","#ff9800","#8bc34a","#e91e63","#9c27b0","#ff5722","#03a9f4","#cddc39"][s_index % 8],
-                    "seedGroup": seed,
-                    "seedGroups": [seed],
-                    "shared": False
-                }
-                all_nodes[pmid] = node
+            local_pmids.update(refs_by_pmid.get(p, []))
+        for pmid in local_pmids:
+            node_seeds[pmid].add(s_index)
 
         # add citation edges (directed)
-        for a in pmids:
-            refs = get_citations_of(a, direction="refs", limit=connector_limit)
-            for b in refs:
-                all_links.add(edge_key(a,b))
+        seed_edges = [(a, b) for a in pmids for b in refs_by_pmid.get(a, [])]
+        all_links.update(seed_edges)
+
+        # join whatever the citations leave disconnected to keep the cluster together
+        all_links.update(_cluster_links(local_pmids, seed_edges))
 
-        # intra-seed linear edges to keep cluster together (optional)
-        local_list = list(local_pmids)
-        for i in range(len(local_list)-1):
-            a = local_list[i]; b = local_list[i+1]
-            all_links.add(edge_key(a,b))
+    # build nodes; PMIDs reached from several seeds are shared and drawn white
+    all_nodes = {}
+    for pmid, s_indexes in node_seeds.items():
+        s_indexes = sorted(s_indexes)
+        shared = len(s_indexes) > 1
+        meta = metas[pmid]
+        mesh_list = [m['descriptor'] for m in meta.get('mesh', [])] if meta.get('mesh') else []
+        all_nodes[pmid] = GraphNode(
+            id=pmid,
+            name=_display_title(meta['title']),
+            title_full=meta['title'],
+            abstract=meta['abstract'],
+            journal=meta['journal'],
+            pubdate=meta['pubdate'],
+            mesh=mesh_list,
+            mesh_detail=meta.get('mesh', []),
+            color="#ffffff" if shared else _PALETTE[s_indexes[0] & 7],
+            seedGroup=seeds[s_indexes[0]],
+            seedGroups=[seeds[i] for i in s_indexes],
+            shared=shared,
+        )
 
     # compute semantic color if shared MeSH
     # --- Compute edges (citations + shared MeSH) ---
     nodes = list(all_nodes.values())
-    node_map = {n['id']: n for n in nodes}
+    node_map = {n.id: n for n in nodes}
+    # each node's MeSH set is built once, not once per edge
+    mesh_sets = {pid: frozenset(n.mesh) for pid, n in node_map.items() if n.mesh}
 
     # Step 1. Start with existing citation-based links
     links = []
     citation_edges = set()
-    for edge in all_links:
-        try:
-            a, b = edge.split("->")
-        except ValueError:
-            continue
+    for a, b in all_links:
         if a not in node_map or b not in node_map:
             continue
-        src = node_map[a]
-        tgt = node_map[b]
         color = "#cccccc"
         semantic = False
         # color green if MeSH overlap
-        if src.get("mesh") and tgt.get("mesh"):
-            shared = set(src["mesh"]).intersection(tgt["mesh"])
-            if shared:
-                color = "#66bb6a"
-                semantic = True
+        s = mesh_sets.get(a)
+        t = mesh_sets.get(b)
+        if s and t and not s.isdisjoint(t):
+            color = "#66bb6a"
+            semantic = True
         links.append({
             "source": a,
             "target": b,
@@ -253,8 +562,8 @@ def api_graph():
     # Group nodes by each MeSH descriptor
     mesh_index = {}
     for n in nodes:
-        for m in n.get("mesh", []):
-            mesh_index.setdefault(m, []).append(n["id"])
+        for m in n.mesh:
+            mesh_index.setdefault(m, []).append(n.id)
 
     # For each MeSH term, connect all pairs of nodes that share it
     for m, pmids in mesh_index.items():
@@ -274,18 +583,19 @@ def api_graph():
                 })
                 citation_edges.add(key)
 
-    return jsonify({"nodes": nodes, "links": links})
+    return app.response_class(_stream_graph(nodes, links), mimetype="application/json")
 
 # serve frontend
 @app.route('/')
-def index():
-    return send_from_directory('static', 'interactive_graph_pubmed.html')
+async def index():
+    return await send_from_directory(app.static_folder, 'interactive_graph_pubmed.html')
 
 @app.route('/<path:p>')
-def static_proxy(p):
+async def static_proxy(p):
     # serve static files under static/
-    return send_from_directory('static', p)
+    return await send_from_directory(app.static_folder, p)
 
 if __name__ == "__main__":
+    # development server only; see README.txt for running under hypercorn
     port = int(os.environ.get("PORT", 8000))
-    app.run(host="0.0.0.0", port=port, debug=True)
+    app.run(host="0.0.0.0", port=port, debug=os.environ.get("DEBUG") == "1")